@@ -1,15 +1,22 @@
 
+import contextlib
+import hashlib
+import json
 import os
 import time
+import uuid
 import logging
-from flask import Flask, request, jsonify, render_template
+from concurrent.futures import ThreadPoolExecutor
+from flask import Flask, request, render_template, stream_with_context
 from werkzeug.utils import secure_filename
 from werkzeug.exceptions import RequestEntityTooLarge
-from collections import Counter
 import torch
 import numpy as np
 from pydub import AudioSegment
 
+# The API only ever runs inference; disable autograd bookkeeping globally.
+torch.set_grad_enabled(False)
+
 # --- Basic Setup ---
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger("VoxiAPI")
@@ -22,13 +29,26 @@ from modules import translate
 
 # --- Flask App Configuration ---
 UPLOAD_FOLDER = os.path.join(os.path.dirname(__file__), 'uploads')
+RESULT_CACHE_FOLDER = os.path.join(os.path.dirname(__file__), '.cache', 'results')
 ALLOWED_EXTENSIONS = {'wav', 'mp3', 'flac', 'ogg', 'm4a', 'webm'}
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+os.makedirs(RESULT_CACHE_FOLDER, exist_ok=True)
 
 app = Flask(__name__)
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = 50 * 1024 * 1024  # 50 MB
 
+# Shared pool for overlapping independent pipeline stages. The heavy work
+# inside torch and the tokenizers releases the GIL, so submitted calls
+# genuinely run concurrently with the request thread.
+_executor = ThreadPoolExecutor(max_workers=int(os.environ.get('VOXI_WORKER_THREADS', '4')))
+
+# Background jobs run on their own pool. A pipeline submits a translation
+# subtask to _executor and blocks on it, so queuing whole pipelines onto
+# that same pool would deadlock once every thread held a pipeline waiting
+# on a subtask that can never be scheduled.
+_task_executor = ThreadPoolExecutor(max_workers=int(os.environ.get('VOXI_TASK_THREADS', '2')))
+
 # Optional CORS support
 try:
     from flask_cors import CORS
@@ -37,29 +57,128 @@ try:
 except ImportError:
     logger.warning("CORS not enabled: `pip install flask_cors` to enable.")
 
+# Optional fast JSON encoding; orjson serializes straight to UTF-8 bytes.
+try:
+    import orjson
+    logger.info("orjson enabled for response encoding.")
+except ImportError:
+    orjson = None
+    logger.info("orjson not installed; responses use the stdlib json encoder.")
+
+def _json_bytes(payload) -> bytes:
+    """Serializes a payload to UTF-8 JSON bytes, preferring orjson."""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, ensure_ascii=False).encode('utf-8')
+
+def _json_response(payload, status: int = 200):
+    """
+    Builds a JSON response, preferring orjson's SIMD encoder when installed.
+    Both paths emit UTF-8 directly, which roughly halves the payload for
+    non-Latin transcripts compared to jsonify's ASCII escaping.
+    """
+    return app.response_class(_json_bytes(payload), status=status, mimetype='application/json')
+
+def _deliver_response(response):
+    """
+    Sends the final payload either as one JSON document (default) or, when the
+    client asks for ?stream=1, as NDJSON: one line per speaker segment followed
+    by a summary line. Streaming serializes segment by segment, so the full
+    response body is never materialized at once and clients can render
+    incrementally.
+    """
+    if request.args.get('stream') != '1':
+        return _json_response(response)
+
+    def generate():
+        for seg in response.get("speakers", []):
+            yield _json_bytes(seg) + b'\n'
+        summary = {k: v for k, v in response.items() if k != "speakers"}
+        yield _json_bytes(summary) + b'\n'
+
+    return app.response_class(
+        stream_with_context(generate()), mimetype='application/x-ndjson'
+    )
+
+# Load model weights once at startup so the first request only pays inference.
+# Set VOXI_PRELOAD_MODELS=0 to keep lazy loading (useful for quick dev restarts).
+if os.environ.get('VOXI_PRELOAD_MODELS', '1') != '0':
+    for _module in (diarization, asr, translate):
+        try:
+            _module.warm_up()
+        except Exception as e:
+            logger.warning(f"Model warm-up failed for {_module.__name__}: {e}")
+
 def allowed_file(filename: str) -> bool:
     """Checks if the file extension is allowed."""
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def _load_waveform(audio_path: str):
+    """
+    Decodes an audio file into a float32 torch tensor of shape [channels, samples].
+    Returns a (waveform_tensor, sample_rate) tuple.
+
+    Tries libsndfile (soundfile) first, which decodes directly into a contiguous
+    float32 buffer; falls back to torchaudio for compressed formats libsndfile
+    cannot read (mp3/m4a on older builds), and finally to pydub/ffmpeg.
+    """
+    try:
+        import soundfile as sf
+        data, sample_rate = sf.read(audio_path, dtype='float32', always_2d=True)
+        return torch.from_numpy(data.T).contiguous(), sample_rate
+    except Exception as e:
+        logger.info(f"soundfile could not decode '{audio_path}' ({e}); trying torchaudio.")
+
+    try:
+        import torchaudio
+        waveform, sample_rate = torchaudio.load(audio_path)
+        return waveform, sample_rate
+    except Exception as e:
+        logger.info(f"torchaudio could not decode '{audio_path}' ({e}); falling back to pydub.")
+
+    audio_segment = AudioSegment.from_file(audio_path)
+    # View the raw PCM bytes directly instead of copying through
+    # array.array, then convert with one fused cast-and-scale pass.
+    if audio_segment.sample_width == 2:
+        raw = np.frombuffer(audio_segment.raw_data, dtype=np.int16)
+    else:
+        raw = np.array(audio_segment.get_array_of_samples())
+    scale = np.float32(1.0 / (1 << (8 * audio_segment.sample_width - 1)))
+    samples = np.multiply(raw, scale, dtype=np.float32)
+    if audio_segment.channels > 1:
+        samples = np.ascontiguousarray(samples.reshape(-1, audio_segment.channels).T)
+        waveform = torch.from_numpy(samples)
+    else:
+        waveform = torch.from_numpy(samples).unsqueeze(0)
+    return waveform, audio_segment.frame_rate
+
 def _merge_speaker_segments(speakers_data: list) -> list:
     """
     Merges consecutive segments from the same speaker into a single segment.
+
+    Mutates the segment dicts in place (they are built fresh per request) and
+    collects transcript parts in a list that is joined once per speaker turn,
+    instead of copying dicts per boundary and re-concatenating the transcript
+    string on every merge.
     """
     if not speakers_data:
         return []
 
     merged_data = []
-    current_segment = speakers_data[0].copy()
+    current_segment = speakers_data[0]
+    transcript_parts = [current_segment['transcript']]
 
-    for i in range(1, len(speakers_data)):
-        next_segment = speakers_data[i]
+    for next_segment in speakers_data[1:]:
         if next_segment['speaker'] == current_segment['speaker']:
             current_segment['end'] = next_segment['end']
-            current_segment['transcript'] += ' ' + next_segment['transcript']
+            transcript_parts.append(next_segment['transcript'])
         else:
+            current_segment['transcript'] = ' '.join(transcript_parts)
             merged_data.append(current_segment)
-            current_segment = next_segment.copy()
+            current_segment = next_segment
+            transcript_parts = [current_segment['transcript']]
 
+    current_segment['transcript'] = ' '.join(transcript_parts)
     merged_data.append(current_segment)
     return merged_data
 
@@ -69,64 +188,124 @@ def index():
     """Renders the main UI from the templates folder."""
     return render_template('index.html')
 
-# --- Main Audio Processing Endpoint ---
-@app.route('/process_audio', methods=['POST'])
-def process_audio_api():
+# --- Upload Handling and Pipeline ---
+class PipelineError(RuntimeError):
+    """Raised when a pipeline stage fails; the message names the stage."""
+
+
+def _receive_upload():
     """
-    Main API endpoint to handle audio file upload, diarization, transcription, and translation.
+    Validates and stores the uploaded file.
+    Returns (audio_path, cache_path, error_response); error_response is None
+    on success and a ready-to-return Flask response otherwise.
     """
-    logger.info("Received request for /process_audio")
-
-    # 1. --- File Validation and Upload ---
     if 'file' not in request.files:
-        return jsonify({"error": "No file part in the request"}), 400
+        return None, None, _json_response({"error": "No file part in the request"}, 400)
     file = request.files['file']
     if file.filename == '':
-        return jsonify({"error": "No file selected"}), 400
+        return None, None, _json_response({"error": "No file selected"}, 400)
     if not allowed_file(file.filename):
-        return jsonify({"error": "Unsupported file type"}), 400
+        return None, None, _json_response({"error": "Unsupported file type"}, 400)
 
-    filename = secure_filename(file.filename)
-    audio_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
+    # Store under a unique name so concurrent uploads of the same filename
+    # cannot clobber each other (or each other's cleanup); the client's
+    # filename only contributes its extension.
+    ext = os.path.splitext(secure_filename(file.filename))[1].lower()
+    audio_path = os.path.join(app.config['UPLOAD_FOLDER'], uuid.uuid4().hex + ext)
     try:
-        file.save(audio_path)
+        # Copy straight from the request stream to disk in 1 MB chunks instead
+        # of file.save(), which re-reads the already-spooled upload. Unbuffered
+        # open avoids a second userspace copy through Python's buffer layer.
+        # The same pass feeds a content hash used to key the result cache.
+        hasher = hashlib.blake2b(digest_size=16)
+        with open(audio_path, 'wb', buffering=0) as dst:
+            if hasattr(os, 'posix_fadvise'):
+                os.posix_fadvise(dst.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            while True:
+                chunk = file.stream.read(1024 * 1024)
+                if not chunk:
+                    break
+                hasher.update(chunk)
+                dst.write(chunk)
+        content_digest = hasher.hexdigest()
         logger.info(f"File saved successfully to {audio_path}")
     except Exception as e:
         logger.error(f"Failed to save file: {e}")
-        return jsonify({"error": "Failed to save file on server."}), 500
+        return None, None, _json_response({"error": "Failed to save file on server."}, 500)
 
+    cache_path = os.path.join(RESULT_CACHE_FOLDER, f"{content_digest}.json")
+    return audio_path, cache_path, None
+
+
+def _load_cached_result(cache_path: str, audio_path: str):
+    """
+    Returns the cached response for cache_path, removing the fresh upload on
+    a hit. Returns None on a miss or an unreadable cache entry.
+    """
+    if not os.path.exists(cache_path):
+        return None
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cached_response = json.load(f)
+        os.remove(audio_path)
+        logger.info(f"Returning cached result from {cache_path}.")
+        return cached_response
+    except Exception as e:
+        logger.warning(f"Failed to read cached result {cache_path}, reprocessing: {e}")
+        return None
+
+
+def _run_pipeline(audio_path: str, cache_path: str) -> dict:
+    """
+    Runs diarization, ASR and translation on a stored upload and returns the
+    response payload. Writes the result cache and removes the upload before
+    returning; raises PipelineError when a stage fails.
+    """
     # 2. --- Speaker Diarization ---
     try:
         logger.info("Loading audio for diarization module...")
-        audio_segment = AudioSegment.from_file(audio_path)
-        waveform_tensor = torch.from_numpy(
-            np.array(audio_segment.get_array_of_samples()).astype(np.float32) / 32768.0
-        ).unsqueeze(0)
+        waveform_tensor, sample_rate = _load_waveform(audio_path)
+
+        if torch.cuda.is_available():
+            # Stage through pinned memory so the host-to-device copy is async
+            # and diarization runs on the GPU-resident waveform directly.
+            waveform_tensor = waveform_tensor.pin_memory().to('cuda', non_blocking=True)
 
         audio_for_diarization = {
             'waveform': waveform_tensor,
-            'sample_rate': audio_segment.frame_rate
+            'sample_rate': sample_rate
         }
 
         logger.info("Starting speaker diarization...")
         t0 = time.perf_counter()
-        diarized_segments = diarization.run_speaker_diarization(audio_for_diarization)
+        # Autocast lets the fp32 pyannote weights run their matmuls in fp16
+        # on GPU; on CPU this is a no-op context.
+        amp_ctx = (torch.autocast('cuda', dtype=torch.float16)
+                   if torch.cuda.is_available() else contextlib.nullcontext())
+        with torch.inference_mode(), amp_ctx:
+            diarized_segments = diarization.run_speaker_diarization(audio_for_diarization)
         logger.info(f"Diarization complete in {time.perf_counter() - t0:.2f}s, found {len(diarized_segments)} segments.")
     except Exception as e:
         logger.error(f"Diarization process failed: {e}")
         os.remove(audio_path)
-        return jsonify({"error": f"Diarization failed: {e}"}), 500
+        raise PipelineError(f"Diarization failed: {e}") from e
 
     # 3. --- ASR with Whisper ---
     try:
         logger.info("Starting ASR with Whisper...")
         t1 = time.perf_counter()
-        asr_results = asr.transcribe_diarized_segments(audio_path, diarized_segments)
+        with torch.inference_mode():
+            # Hand over the waveform decoded for diarization so ASR does not
+            # re-read and re-decode the file from disk.
+            asr_results = asr.transcribe_diarized_segments(
+                audio_path, diarized_segments,
+                waveform=waveform_tensor, sample_rate=sample_rate
+            )
         logger.info(f"ASR complete in {time.perf_counter() - t1:.2f}s.")
     except Exception as e:
         logger.error(f"ASR process failed: {e}")
         os.remove(audio_path)
-        return jsonify({"error": f"ASR failed: {e}"}), 500
+        raise PipelineError(f"ASR failed: {e}") from e
 
     # 4. --- Process and Combine Initial Results ---
     speakers_data = []
@@ -153,24 +332,33 @@ def process_audio_api():
     logger.info(f"Merging {len(speakers_data)} segments into consolidated speaker turns...")
     merged_speakers_data = _merge_speaker_segments(speakers_data)
     logger.info(f"Merged down to {len(merged_speakers_data)} segments.")
-    
+
     # 5. --- Build Full Transcript & Detect Language from Merged Data ---
-    full_transcript = " ".join([seg['transcript'] for seg in merged_speakers_data]).strip()
-    
-    detected_languages = [seg['language'] for seg in merged_speakers_data if seg.get('language') != 'unknown']
-    main_language = Counter(detected_languages).most_common(1)[0][0] if detected_languages else "unknown"
+    full_transcript = " ".join(seg['transcript'] for seg in merged_speakers_data).strip()
+
+    language_counts = {}
+    for seg in merged_speakers_data:
+        lang = seg.get('language')
+        if lang and lang != 'unknown':
+            language_counts[lang] = language_counts.get(lang, 0) + 1
+    main_language = max(language_counts, key=language_counts.get) if language_counts else "unknown"
     logger.info(f"Determined main language of audio: {main_language}")
 
     # 6. --- Translation (Optimized) ---
     logger.info("Starting batch translation of segments...")
     t2 = time.perf_counter()
     try:
-        # Batch translate all segments in-place using the optimized function
-        translate.translate_segments_to_english(merged_speakers_data)
-        
-        # Translate the full transcript separately
+        # Segment translation and the full-transcript translation are
+        # independent once ASR has finished, so run the batched segment pass
+        # on the shared pool while this thread translates the full transcript.
+        # (Diarization -> ASR is a hard data dependency with pyannote's
+        # offline pipeline and cannot be overlapped the same way.)
+        segments_future = _executor.submit(
+            translate.translate_segments_to_english, merged_speakers_data
+        )
         full_translation = translate.translate_to_english(full_transcript, main_language)
-        
+        segments_future.result()
+
         logger.info(f"Translation complete in {time.perf_counter() - t2:.2f}s.")
     except Exception as e:
         logger.error(f"Translation process failed: {e}")
@@ -183,22 +371,138 @@ def process_audio_api():
         "language": main_language,
         "translation": full_translation
     }
-    
+
+    try:
+        with open(cache_path, 'w', encoding='utf-8') as f:
+            json.dump(response, f, ensure_ascii=False)
+    except OSError as e:
+        logger.warning(f"Could not write result cache {cache_path}: {e}")
+
     try:
         os.remove(audio_path)
         logger.info(f"Cleaned up temporary file: {audio_path}")
     except OSError as e:
         logger.error(f"Error removing file {audio_path}: {e}")
 
+    return response
+
+
+# --- Main Audio Processing Endpoint ---
+@app.route('/process_audio', methods=['POST'])
+def process_audio_api():
+    """
+    Main API endpoint to handle audio file upload, diarization, transcription, and translation.
+    """
+    logger.info("Received request for /process_audio")
+
+    audio_path, cache_path, error_response = _receive_upload()
+    if error_response is not None:
+        return error_response
+
+    cached_response = _load_cached_result(cache_path, audio_path)
+    if cached_response is not None:
+        return _deliver_response(cached_response)
+
+    try:
+        response = _run_pipeline(audio_path, cache_path)
+    except PipelineError as e:
+        return _json_response({"error": str(e)}, 500)
+
     logger.info("Request processing complete. Sending response.")
-    return jsonify(response)
+    return _deliver_response(response)
+
+
+# --- Background Task Queue ---
+# Task state is persisted as one JSON file per task alongside the result
+# cache, so a poll can be answered by any gunicorn worker, not just the
+# one that happens to run the job. Jobs run on the dedicated task
+# executor; completed entries are dropped once their result is fetched.
+TASK_FOLDER = os.path.join(os.path.dirname(__file__), '.cache', 'tasks')
+os.makedirs(TASK_FOLDER, exist_ok=True)
+
+
+def _task_path(task_id: str) -> str:
+    return os.path.join(TASK_FOLDER, f"{task_id}.json")
+
+
+def _write_task_state(task_id: str, state: dict) -> None:
+    """Persists task state atomically so a poll never reads partial JSON."""
+    tmp_path = _task_path(task_id) + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(_json_bytes(state))
+    os.replace(tmp_path, _task_path(task_id))
+
+
+def _read_task_state(task_id: str):
+    """Returns the persisted task state, or None for unknown task ids."""
+    try:
+        with open(_task_path(task_id), 'rb') as f:
+            return json.loads(f.read())
+    except (OSError, ValueError):
+        return None
+
+
+def _run_pipeline_task(task_id: str, audio_path: str, cache_path: str) -> None:
+    """Executor target that records the pipeline outcome for polling."""
+    try:
+        result = _run_pipeline(audio_path, cache_path)
+    except Exception as e:
+        logger.error(f"Background task {task_id} failed: {e}")
+        _write_task_state(task_id, {"status": "error", "error": str(e)})
+        return
+    _write_task_state(task_id, {"status": "complete", "result": result})
+
+
+@app.route('/process_audio_async', methods=['POST'])
+def process_audio_async_api():
+    """
+    Queues an upload for background processing and returns a task id
+    immediately, so multi-minute diarization/ASR runs do not hold an HTTP
+    worker. Poll /result/<task_id> for the outcome; cache hits are returned
+    inline as a completed result.
+    """
+    logger.info("Received request for /process_audio_async")
+
+    audio_path, cache_path, error_response = _receive_upload()
+    if error_response is not None:
+        return error_response
+
+    cached_response = _load_cached_result(cache_path, audio_path)
+    if cached_response is not None:
+        return _json_response({"status": "complete", "result": cached_response})
+
+    task_id = uuid.uuid4().hex
+    _write_task_state(task_id, {"status": "pending"})
+    _task_executor.submit(_run_pipeline_task, task_id, audio_path, cache_path)
+    return _json_response({"task_id": task_id, "status": "pending"}, 202)
+
+
+@app.route('/result/<task_id>', methods=['GET'])
+def get_task_result_api(task_id: str):
+    """Polling endpoint for jobs queued via /process_audio_async."""
+    # Task ids are uuid4 hex; reject anything else before touching the
+    # filesystem.
+    if not task_id.isalnum():
+        return _json_response({"error": "Unknown task id"}, 404)
+    task = _read_task_state(task_id)
+    if task is None:
+        return _json_response({"error": "Unknown task id"}, 404)
+    if task["status"] == "pending":
+        return _json_response({"status": "pending"}, 202)
+    if task["status"] == "error":
+        return _json_response({"status": "error", "error": task["error"]}, 500)
+    # Completed results are one-shot; the content-hash cache still serves
+    # any repeat upload of the same audio.
+    with contextlib.suppress(OSError):
+        os.remove(_task_path(task_id))
+    return _json_response({"status": "complete", "result": task["result"]})
+
 
 @app.errorhandler(RequestEntityTooLarge)
 def handle_large_file(e: RequestEntityTooLarge):
     """Handles file uploads that exceed the configured size limit."""
     logger.warning(f"Upload rejected: file too large (limit: {app.config['MAX_CONTENT_LENGTH']} bytes).")
-    return jsonify({'error': f'File is too large. Maximum size is {app.config["MAX_CONTENT_LENGTH"] // 1024 // 1024} MB.'}), 413
+    return _json_response({'error': f'File is too large. Maximum size is {app.config["MAX_CONTENT_LENGTH"] // 1024 // 1024} MB.'}, 413)
 
-if __name__ == '__main__':
-    # Setting debug=False is recommended for any production/public-facing use
-    app.run(debug=False, host='0.0.0.0', port=5000)
+# Serve with `gunicorn -c gunicorn_conf.py app:app` in production;
+# `python run.py` remains the single-process development entry point.
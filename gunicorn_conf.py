@@ -0,0 +1,38 @@
+"""
+Gunicorn configuration for serving the Voxi AI API.
+
+Launch with:
+    gunicorn -c gunicorn_conf.py app:app
+
+On CPU-only hosts preload_app loads the model singletons once in the
+master process, so forked workers share the weights copy-on-write instead
+of each paying checkpoint I/O and RAM. A CUDA context cannot survive
+fork, so on GPU hosts preloading is disabled and each worker imports (and
+warms) the app itself. Threaded workers let uploads and JSON I/O overlap
+while torch holds the GIL-free compute sections.
+"""
+import os
+
+try:
+    # is_available() is fork-safe: it queries the driver without creating
+    # a CUDA context in the master.
+    import torch
+    _has_cuda = torch.cuda.is_available()
+except ImportError:
+    _has_cuda = False
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+
+# Each worker holds its own CUDA context, so keep the count small by
+# default and scale it explicitly on multi-GPU / CPU-only hosts.
+workers = int(os.environ.get('WEB_WORKERS', '2'))
+worker_class = 'gthread'
+threads = int(os.environ.get('WEB_THREADS', '4'))
+
+# Preloading a CUDA-initialized app in the master breaks every GPU call in
+# the forked workers ("Cannot re-initialize CUDA in forked subprocess").
+preload_app = not _has_cuda
+
+# Diarization + ASR on a 50 MB file can legitimately take minutes.
+timeout = int(os.environ.get('WEB_TIMEOUT', '600'))
+graceful_timeout = 30
@@ -5,31 +5,212 @@ import numpy as np
 import torch
 import whisper
 from pydub import AudioSegment
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 
 logger = logging.getLogger("VoxiAPI")
 
+# Process-wide torch tuning, applied once when the ASR module loads.
+if torch.cuda.is_available():
+    # Autotuned convolutions for the encoder stem, and TF32 matmuls on
+    # Ampere+ (~2x throughput at negligible accuracy cost).
+    torch.backends.cudnn.benchmark = True
+    torch.backends.cuda.matmul.allow_tf32 = True
+    torch.backends.cudnn.allow_tf32 = True
+else:
+    # Cap intra-op threads so several gthread workers don't oversubscribe
+    # the host with workers x BLAS-threads; interop parallelism buys
+    # nothing for sequential decode loops.
+    try:
+        torch.set_num_threads(
+            int(os.environ.get("VOXI_TORCH_THREADS", max(1, (os.cpu_count() or 2) // 2))))
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        # interop thread count can only be set before the pool starts;
+        # harmless if another import already ran a parallel op.
+        pass
+
+# Optional CTranslate2 backend. When faster-whisper is installed it is used
+# automatically; set VOXI_ASR_BACKEND=whisper to force the reference model.
+try:
+    from faster_whisper import WhisperModel as FasterWhisperModel
+except ImportError:
+    FasterWhisperModel = None
+
 # --- Model Management ---
-_whisper_model: Optional[whisper.Whisper] = None
+_whisper_models: Dict[tuple, whisper.Whisper] = {}
+_faster_whisper_model = None
+
+def _maybe_compile_model(model: whisper.Whisper) -> None:
+    """
+    Compiles the Whisper audio encoder with torch.compile so repeated requests
+    replay a fused graph instead of paying per-op dispatch overhead.
+    Set VOXI_TORCH_COMPILE=0 to keep the model fully eager. The decoder is left
+    eager because its autoregressive loop changes shape every step.
+    """
+    if os.environ.get("VOXI_TORCH_COMPILE", "1") == "0" or not hasattr(torch, "compile"):
+        return
+    try:
+        model.encoder = torch.compile(model.encoder, mode="reduce-overhead", dynamic=True)
+        logger.info("Whisper encoder compiled with torch.compile(mode='reduce-overhead').")
+    except Exception as e:
+        logger.warning(f"torch.compile unavailable for Whisper encoder, staying eager: {e}")
 
 def get_whisper_model(model_name: str = "medium") -> whisper.Whisper:
     """
-    Loads the Whisper model lazily and caches it.
+    Loads a Whisper model lazily, cached by (model name, device) so differently
+    sized models (e.g. 'tiny' for language ID alongside 'medium' for
+    transcription) never alias each other in the cache.
     Uses the 'medium' model by default for a good balance of accuracy and speed.
     """
-    global _whisper_model
-    if _whisper_model is None:
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    key = (model_name, device)
+    model = _whisper_models.get(key)
+    if model is None:
         try:
-            device = "cuda" if torch.cuda.is_available() else "cpu"
             logger.info(f"Loading Whisper '{model_name}' model on '{device}' device...")
-            _whisper_model = whisper.load_model(model_name, device=device)
+            model = whisper.load_model(model_name, device=device)
             logger.info(f"Whisper '{model_name}' model loaded successfully.")
+            if device == "cuda":
+                # The checkpoints ship fp16 weights but load into fp32
+                # parameters. Casting back to half halves weight memory and
+                # stops whisper's Linear/Conv1d layers re-casting weights on
+                # every forward pass during fp16 decoding.
+                model = model.half()
+            elif os.environ.get("VOXI_WHISPER_INT8", "0") == "1":
+                # Opt-in dynamic int8 quantization for CPU-only deployments;
+                # the decoder is memory-bandwidth bound, so int8 weights can
+                # help at a small accuracy cost. Whisper's projections are
+                # whisper.model.Linear (a subclass), which the default
+                # module mapping keyed on exact type silently skips, so the
+                # swap targets are spelled out explicitly and the result is
+                # checked before claiming success.
+                try:
+                    import torch.ao.nn.quantized.dynamic as nnqd
+                    import whisper.model as whisper_model
+                    mapping = {torch.nn.Linear: nnqd.Linear,
+                               whisper_model.Linear: nnqd.Linear}
+                    quantized = torch.quantization.quantize_dynamic(
+                        model, set(mapping), dtype=torch.qint8, mapping=mapping,
+                    )
+                    n_converted = sum(1 for m in quantized.modules()
+                                      if isinstance(m, nnqd.Linear))
+                    if n_converted:
+                        model = quantized
+                        logger.info(f"Dynamic int8 quantization converted "
+                                    f"{n_converted} linear layers.")
+                    else:
+                        logger.warning("Dynamic int8 quantization converted no "
+                                       "layers; keeping fp32 weights.")
+                except Exception as e:
+                    logger.warning(f"Dynamic int8 quantization failed, keeping fp32: {e}")
+            _maybe_compile_model(model)
+            _whisper_models[key] = model
         except Exception as e:
             logger.error(f"Fatal error: Failed to load Whisper model: {e}")
             raise  # Re-raise the exception to halt execution if the model can't load
-    return _whisper_model
+    return model
+
+def _get_faster_whisper_model(model_name: str = "medium"):
+    """
+    Lazily loads the faster-whisper (CTranslate2) model. Returns None when the
+    package is missing, loading fails, or VOXI_ASR_BACKEND=whisper forces the
+    reference implementation, so callers can fall back to openai-whisper.
+    """
+    global _faster_whisper_model
+    if FasterWhisperModel is None or os.environ.get("VOXI_ASR_BACKEND", "auto") == "whisper":
+        return None
+    if _faster_whisper_model is None:
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+        # int8 weights halve memory bandwidth; CTranslate2 keeps activations
+        # in fp16 on GPU and uses VNNI/AMX int8 GEMMs on modern CPUs.
+        default_compute = "int8_float16" if device == "cuda" else "int8"
+        compute_type = os.environ.get("VOXI_FW_COMPUTE", default_compute)
+        try:
+            logger.info(f"Loading faster-whisper '{model_name}' on '{device}' ({compute_type})...")
+            _faster_whisper_model = FasterWhisperModel(model_name, device=device, compute_type=compute_type)
+            logger.info("faster-whisper model loaded successfully.")
+        except Exception as e:
+            logger.warning(f"Failed to load faster-whisper, using openai-whisper instead: {e}")
+            _faster_whisper_model = False  # cache the failure, don't retry per call
+    return _faster_whisper_model or None
+
+def _transcribe_faster_whisper(model, audio_data: np.ndarray,
+                               language: Optional[str] = None) -> Dict[str, Any]:
+    """Transcribes one prepared segment on the CTranslate2 runtime."""
+    segments, info = model.transcribe(audio_data, beam_size=1,
+                                      condition_on_previous_text=False,
+                                      language=language)
+    texts: List[str] = []
+    logprobs: List[float] = []
+    for seg in segments:
+        texts.append(seg.text.strip())
+        logprobs.append(seg.avg_logprob)
+    return {
+        "text": " ".join(texts).strip(),
+        "language": getattr(info, "language", None) or "unknown",
+        "avg_logprob": sum(logprobs) / len(logprobs) if logprobs else -1.0,
+    }
+
+def warm_up() -> None:
+    """
+    Loads the active ASR model and runs a short silent decode so the first
+    real request does not pay model load or lazy kernel-selection cost.
+    """
+    silence = np.zeros(16000, dtype=np.float32)
+    fw_model = _get_faster_whisper_model()
+    try:
+        if fw_model is not None:
+            _transcribe_faster_whisper(fw_model, silence)
+        else:
+            with torch.inference_mode():
+                get_whisper_model().transcribe(silence, fp16=torch.cuda.is_available(), verbose=None)
+        logger.info("Whisper warm-up decode complete.")
+    except Exception as e:
+        logger.warning(f"Whisper warm-up decode failed (continuing with cold model): {e}")
 
 # --- Audio Processing ---
+def _resample_to_16k(samples: np.ndarray, sample_rate: int) -> np.ndarray:
+    """Resamples mono float32 audio to Whisper's required 16 kHz."""
+    if sample_rate == 16000:
+        return samples
+    try:
+        import soxr
+        return soxr.resample(samples, sample_rate, 16000, quality='HQ')
+    except ImportError:
+        from math import gcd
+        from scipy.signal import resample_poly
+        g = gcd(16000, sample_rate)
+        return resample_poly(samples, 16000 // g, sample_rate // g).astype(np.float32)
+
+def _downmix_to_mono(channels: np.ndarray) -> np.ndarray:
+    """Averages [channels, samples] float32 audio down to a single channel."""
+    if channels.shape[0] == 1:
+        return channels[0]
+    if channels.shape[0] == 2:
+        # The common stereo case: (l + r) * 0.5 over one output buffer,
+        # skipping np.mean's generic reduction and its intermediate array.
+        out = np.add(channels[0], channels[1], dtype=np.float32)
+        out *= np.float32(0.5)
+        return out
+    return channels.mean(axis=0, dtype=np.float32)
+
+def _prepare_waveform(waveform, sample_rate: int) -> np.ndarray:
+    """
+    Converts an already-decoded [channels, samples] tensor/array at any rate
+    into the mono 16 kHz float32 layout Whisper expects, without touching disk.
+    """
+    try:
+        if isinstance(waveform, torch.Tensor):
+            arr = waveform.detach().float().cpu().numpy()
+        else:
+            arr = np.asarray(waveform, dtype=np.float32)
+        if arr.ndim > 1:
+            arr = _downmix_to_mono(arr)
+        return _resample_to_16k(np.ascontiguousarray(arr, dtype=np.float32), int(sample_rate))
+    except Exception as e:
+        logger.error(f"Failed to prepare in-memory waveform: {e}")
+        return np.array([], dtype=np.float32)
+
 def _load_and_prepare_audio(
     audio_path: str,
     start_time: Optional[float] = None,
@@ -37,60 +218,97 @@ def _load_and_prepare_audio(
 ) -> np.ndarray:
     """
     A single, unified function to load, segment, and prepare audio for Whisper.
-    Converts audio to mono, 16kHz, and float32 format as required by Whisper.
+    Returns mono, 16 kHz, float32 samples normalized to [-1.0, 1.0].
+
+    Decodes with libsndfile and resamples in-process with soxr's polyphase
+    filters, avoiding pydub's ffmpeg subprocess round-trip; pydub remains the
+    fallback for containers libsndfile cannot read.
     """
     try:
-        audio = AudioSegment.from_file(audio_path)
-
-        # 1. Extract segment if start and end times are provided
-        if start_time is not None and end_time is not None:
-            start_ms = int(start_time * 1000)
-            end_ms = int(end_time * 1000)
-            audio = audio[start_ms:end_ms]
-
-        # 2. Resample to 16kHz (Whisper's required sample rate)
-        if audio.frame_rate != 16000:
-            audio = audio.set_frame_rate(16000)
-
-        # 3. Convert to mono
-        if audio.channels > 1:
-            audio = audio.set_channels(1)
-
-        # 4. Convert to float32 numpy array and normalize to [-1.0, 1.0]
-        # pydub stores samples as signed 16-bit integers (from -32768 to 32767)
-        samples = np.array(audio.get_array_of_samples()).astype(np.float32)
-        samples /= 32768.0
-
-        return samples
-
+        import soundfile as sf
+        data, sample_rate = sf.read(audio_path, dtype='float32', always_2d=True)
+        mono = _downmix_to_mono(data.T) if data.shape[1] > 1 else data[:, 0]
+        samples = _resample_to_16k(np.ascontiguousarray(mono, dtype=np.float32), sample_rate)
     except Exception as e:
-        logger.error(f"Failed to load or process audio file '{audio_path}': {e}")
-        return np.array([], dtype=np.float32) # Return an empty array on failure
+        logger.info(f"soundfile could not decode '{audio_path}' ({e}); falling back to pydub.")
+        try:
+            audio = AudioSegment.from_file(audio_path)
+            if audio.frame_rate != 16000:
+                audio = audio.set_frame_rate(16000)
+            if audio.channels > 1:
+                audio = audio.set_channels(1)
+            # View the raw PCM bytes directly for the common 16-bit case;
+            # other sample widths go through pydub's parsed samples so they
+            # are not misread as int16. Cast-and-scale in one fused pass,
+            # scaled by the actual width.
+            if audio.sample_width == 2:
+                raw = np.frombuffer(audio.raw_data, dtype=np.int16)
+            else:
+                raw = np.array(audio.get_array_of_samples())
+            scale = np.float32(1.0 / (1 << (8 * audio.sample_width - 1)))
+            samples = np.multiply(raw, scale, dtype=np.float32)
+        except Exception as e:
+            logger.error(f"Failed to load or process audio file '{audio_path}': {e}")
+            return np.array([], dtype=np.float32) # Return an empty array on failure
+
+    # Extract the requested slice at the target rate; a numpy slice is a view.
+    if start_time is not None and end_time is not None:
+        samples = samples[int(start_time * 16000):int(end_time * 16000)]
+    return samples
 
 # --- Core ASR Functions ---
-def transcribe_audio_segment(audio_data: np.ndarray) -> Dict[str, Any]:
+def transcribe_audio_segment(audio_data: np.ndarray,
+                             language: Optional[str] = None) -> Dict[str, Any]:
     """
     Transcribes a single audio segment (as a numpy array) using Whisper.
-    This function now expects a pre-processed numpy array.
+    This function now expects a pre-processed numpy array. Passing a language
+    code skips Whisper's per-window language-identification pass.
     """
     if not isinstance(audio_data, np.ndarray) or audio_data.size == 0:
         logger.warning("Received empty or invalid audio data for transcription.")
         return {"text": "", "language": "unknown", "avg_logprob": -1.0}
 
+    fw_model = _get_faster_whisper_model()
+    if fw_model is not None:
+        try:
+            return _transcribe_faster_whisper(fw_model, audio_data, language=language)
+        except Exception as e:
+            logger.warning(f"faster-whisper transcription failed, retrying with openai-whisper: {e}")
+
     try:
         model = get_whisper_model()
 
-        # Set transcription options.
-        # verbose=None will show progress bars for long files.
+        # A segment that fits one 30-second window needs no sliding-window
+        # loop: a single pad -> mel -> decode pass does the same work with
+        # one fewer mel computation and no Python chunk loop.
+        window_samples = whisper.audio.CHUNK_LENGTH * whisper.audio.SAMPLE_RATE
+        if audio_data.shape[0] <= window_samples:
+            try:
+                return _decode_batched(model, [audio_data], fallback=False,
+                                       language=language)[0]
+            except Exception as e:
+                logger.warning(f"Single-window decode failed, using transcribe(): {e}")
+
+        # Greedy single-pass decoding: diarized segments are short, so the
+        # default 5-beam search plus the temperature-fallback ladder mostly
+        # burns compute. Dropping the cross-segment conditioning is also more
+        # robust when consecutive segments come from different speakers.
         transcribe_options = {
             "task": "transcribe",
             "fp16": torch.cuda.is_available(),
-            "verbose": None,
-            "word_timestamps": False  # Set to True if you need word-level timings
+            "verbose": None,  # fully silent; verbose=False would show the tqdm bar
+            "word_timestamps": False,  # Set to True if you need word-level timings
+            "without_timestamps": True,  # skip timestamp-token decode steps
+            "beam_size": 1,
+            "best_of": 1,
+            "temperature": 0.0,
+            "condition_on_previous_text": False,
+            "language": language,
         }
 
         # Let Whisper handle audio length; no need to manually truncate.
-        result = model.transcribe(audio_data, **transcribe_options)
+        with torch.inference_mode():
+            result = model.transcribe(audio_data, **transcribe_options)
 
         # Calculate an average confidence score (log probability)
         # Note: This is a pseudo-confidence score. Higher is better.
@@ -110,38 +328,216 @@ def transcribe_audio_segment(audio_data: np.ndarray) -> Dict[str, Any]:
         return {"text": "[Transcription Error]", "language": "unknown", "avg_logprob": -1.0}
 
 
-def transcribe_diarized_segments(audio_path: str, diarization_output: list) -> list:
+# How many diarized segments to decode per Whisper forward pass.
+_ASR_BATCH_SIZE = int(os.environ.get("VOXI_ASR_BATCH_SIZE", "8"))
+
+def _decode_batched(model: whisper.Whisper, audios: List[np.ndarray],
+                    fallback: bool = True,
+                    language: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Decodes segments that each fit in one 30-second Whisper window as batches.
+    Every segment is padded to the fixed window (the encoder input is always
+    30 s, so there is no extra padding waste), the log-mel features are stacked
+    into a [B, n_mels, T] batch, and one decode runs per batch so the model
+    sees large matmuls instead of B sequential small ones.
+    """
+    results: List[Dict[str, Any]] = []
+    if not audios:
+        return results
+
+    options = whisper.DecodingOptions(
+        task="transcribe",
+        fp16=torch.cuda.is_available(),
+        without_timestamps=True,
+        language=language,
+    )
+    n_mels = getattr(model.dims, "n_mels", 80)
+
+    for i in range(0, len(audios), _ASR_BATCH_SIZE):
+        batch = audios[i:i + _ASR_BATCH_SIZE]
+        mels = torch.stack([
+            whisper.log_mel_spectrogram(whisper.pad_or_trim(audio), n_mels)
+            for audio in batch
+        ])
+        if model.device.type == "cuda":
+            # Stage the batch in pinned memory so the H2D copy is async and
+            # the CPU can start building the next batch's mels meanwhile.
+            mels = mels.pin_memory().to(model.device, non_blocking=True)
+        else:
+            mels = mels.to(model.device)
+        try:
+            with torch.inference_mode():
+                decoded = model.decode(mels, options)
+        except Exception as e:
+            if not fallback:
+                raise
+            logger.error(f"Batched Whisper decode failed, falling back to per-segment transcription: {e}")
+            results.extend(transcribe_audio_segment(audio, language=language)
+                           for audio in batch)
+            continue
+        for res in decoded:
+            results.append({
+                "text": res.text.strip(),
+                "language": res.language or "unknown",
+                "avg_logprob": res.avg_logprob,
+            })
+    return results
+
+
+def _detect_file_language(full_audio: np.ndarray) -> Optional[str]:
+    """
+    Runs Whisper language identification once, over the first window of the
+    file, so monolingual recordings can skip the per-segment detect pass.
+
+    Language ID only needs a rough encoder pass, so this uses a small
+    dedicated model ('tiny' by default, VOXI_LID_MODEL to override) that the
+    get_whisper_model cache keeps alongside the transcription model.
+    """
+    try:
+        model = get_whisper_model(os.environ.get("VOXI_LID_MODEL", "tiny"))
+        n_mels = getattr(model.dims, "n_mels", 80)
+        mel = whisper.log_mel_spectrogram(whisper.pad_or_trim(full_audio), n_mels).to(model.device)
+        if model.device.type == "cuda":
+            mel = mel.half()
+        with torch.inference_mode():
+            _, probs = model.detect_language(mel)
+        language = max(probs, key=probs.get)
+        logger.info("File-level language detection: %s", language)
+        return language
+    except Exception as e:
+        logger.warning(f"File-level language detection failed: {e}")
+        return None
+
+
+def _coalesce_adjacent_segments(diarization_output: list,
+                                max_duration: float = 28.0,
+                                max_gap: float = 1.0) -> list:
+    """
+    Coalesces consecutive same-speaker turns separated by short gaps into one
+    segment, as long as the combined span still fits a single Whisper window.
+    The encoder always processes a full 30-second window, so a 1-second turn
+    costs as much as a 28-second one; stitching turns divides encoder passes
+    by the clumping factor. The API merges consecutive same-speaker turns
+    after ASR anyway, so the response shape is unchanged.
+    """
+    coalesced = []
+    for seg in diarization_output:
+        start = seg.get("start")
+        end = seg.get("end")
+        if start is None or end is None:
+            coalesced.append(dict(seg))
+            continue
+        if coalesced:
+            prev = coalesced[-1]
+            if (prev.get("speaker", "UNK") == seg.get("speaker", "UNK")
+                    and prev.get("end") is not None
+                    and start - prev["end"] <= max_gap
+                    and end - prev["start"] <= max_duration):
+                prev["end"] = end
+                continue
+        coalesced.append(dict(seg))
+    return coalesced
+
+
+def transcribe_diarized_segments(audio_path: str, diarization_output: list,
+                                 waveform=None, sample_rate: Optional[int] = None) -> list:
     """
     Transcribes a list of diarized segments from an audio file.
+
+    When the caller already holds the decoded waveform (e.g. the one used for
+    diarization), pass it via waveform/sample_rate to skip re-decoding the
+    file from disk.
+
+    Segments that fit Whisper's 30-second window (virtually all diarized
+    turns) are decoded in batched forward passes; longer segments fall back
+    to the chunked transcribe() path. On the faster-whisper backend every
+    segment goes through the CTranslate2 runtime instead, which does its own
+    intra-op batching.
     """
-    results = []
-    logger.info(f"Starting Whisper transcription for {len(diarization_output)} diarized segments...")
+    model = get_whisper_model() if _get_faster_whisper_model() is None else None
 
-    for i, segment_info in enumerate(diarization_output):
-        start = segment_info.get("start")
-        end = segment_info.get("end")
-        speaker = segment_info.get("speaker", "UNK")
+    coalesced = _coalesce_adjacent_segments(diarization_output)
+    if len(coalesced) < len(diarization_output):
+        logger.info("Coalesced %d diarized turns into %d ASR segments.",
+                    len(diarization_output), len(coalesced))
+    diarization_output = coalesced
+
+    # Decode the file once; extracting each segment is then an O(1) numpy
+    # view slice instead of one full-file decode per segment. A waveform
+    # handed in by the caller skips even that single decode.
+    if waveform is not None and sample_rate:
+        full_audio = _prepare_waveform(waveform, sample_rate)
+        if full_audio.size == 0:
+            full_audio = _load_and_prepare_audio(audio_path)
+    else:
+        full_audio = _load_and_prepare_audio(audio_path)
 
-        # Load and prepare just the audio for this specific segment
-        audio_segment_data = _load_and_prepare_audio(audio_path, start_time=start, end_time=end)
+    # Convert all boundaries to clamped sample indices in one vectorized pass
+    # instead of parsing and multiplying per segment in Python.
+    if full_audio.size and diarization_output:
+        bounds = np.array(
+            [[seg.get("start") or 0.0, seg.get("end") or 0.0] for seg in diarization_output],
+            dtype=np.float64,
+        )
+        sample_bounds = np.clip((bounds * 16000).astype(np.int64), 0, full_audio.shape[0])
+    else:
+        sample_bounds = np.zeros((len(diarization_output), 2), dtype=np.int64)
 
+    # VOXI_LANG_DETECT=file detects the language once for the whole file and
+    # pins it for every segment, saving one encoder pass per window. The
+    # default stays per-segment because code-switched recordings (a core use
+    # case) need each turn identified on its own.
+    file_language = None
+    if (os.environ.get("VOXI_LANG_DETECT", "per_segment") == "file"
+            and model is not None and full_audio.size):
+        file_language = _detect_file_language(full_audio)
+
+    loaded = []
+    for i, segment_info in enumerate(diarization_output):
+        s, e = sample_bounds[i]
+        audio_segment_data = full_audio[s:e]
         if audio_segment_data.size == 0:
-            logger.warning(f"Skipping empty audio segment {i+1} for speaker {speaker}")
+            logger.warning("Skipping empty audio segment %d for speaker %s",
+                           i + 1, segment_info.get("speaker", "UNK"))
             continue
+        loaded.append((segment_info, audio_segment_data))
 
-        # Perform transcription on the prepared segment
-        asr_result = transcribe_audio_segment(audio_segment_data)
+    logger.info(f"Starting Whisper transcription for {len(loaded)} diarized segments "
+                f"(batch size {_ASR_BATCH_SIZE})...")
 
+    asr_by_index = {}
+    if model is not None:
+        window_samples = whisper.audio.CHUNK_LENGTH * whisper.audio.SAMPLE_RATE
+        batchable = [(idx, audio) for idx, (_, audio) in enumerate(loaded)
+                     if audio.shape[0] <= window_samples]
+        asr_by_index = dict(zip(
+            (idx for idx, _ in batchable),
+            _decode_batched(model, [audio for _, audio in batchable],
+                            language=file_language),
+        ))
+
+    results = []
+    for idx, (segment_info, audio_segment_data) in enumerate(loaded):
+        asr_result = asr_by_index.get(idx)
+        if asr_result is None:
+            # Not covered by the batched decode: either longer than one
+            # window (transcribe() chunks it) or the faster-whisper backend.
+            asr_result = transcribe_audio_segment(audio_segment_data,
+                                                  language=file_language)
+
+        speaker = segment_info.get("speaker", "UNK")
         enriched_segment = {
             "speaker": speaker,
-            "start_time": start,
-            "end_time": end,
+            "start_time": segment_info.get("start"),
+            "end_time": segment_info.get("end"),
             "transcription": asr_result["text"],
             "language": asr_result["language"],
             "confidence": asr_result["avg_logprob"], # Using avg_logprob as confidence
         }
         results.append(enriched_segment)
-        logger.info(f"Processed segment {i+1}/{len(diarization_output)}: Speaker {speaker} -> '{asr_result['text'][:60]}...'")
+        # Lazy %-formatting: no string work at all when INFO is disabled.
+        logger.info("Processed segment %d/%d: Speaker %s -> '%.60s...'",
+                    idx + 1, len(loaded), speaker, asr_result['text'])
 
     logger.info("Whisper transcription for all diarized segments completed.")
     return results
@@ -167,7 +563,8 @@ def translate_audio_to_english(audio_path: str) -> str:
             "fp16": torch.cuda.is_available(),
         }
 
-        result = model.transcribe(audio_data, **translate_options)
+        with torch.inference_mode():
+            result = model.transcribe(audio_data, **translate_options)
         translation = result.get("text", "").strip()
         logger.info(f"Translation successful: '{translation[:80]}...'")
         return translation
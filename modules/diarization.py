@@ -3,6 +3,7 @@ Speaker diarization module using pyannote.audio.
 Provides run_speaker_diarization(audio_data) -> List[segments].
 """
 from typing import List, Dict, Any
+import functools
 import os
 import logging
 import numpy as np
@@ -20,8 +21,13 @@ warnings.filterwarnings(
 logger = logging.getLogger("VoxiAPI")
 _pipeline = None
 
+@functools.lru_cache(maxsize=1)
 def _get_hf_token() -> str:
-    """Gets the Hugging Face token from environment variables or local files."""
+    """Gets the Hugging Face token from environment variables or local files.
+
+    Memoized so additional pipelines sharing the token never re-read the
+    token files from disk.
+    """
     token = (
         os.environ.get("HUGGINGFACE_TOKEN")
         or os.environ.get("HF_TOKEN")
@@ -66,6 +72,10 @@ def _get_pipeline() -> Pipeline:
             raise
     return _pipeline
 
+def warm_up() -> None:
+    """Loads the pyannote pipeline ahead of the first request."""
+    _get_pipeline()
+
 def run_speaker_diarization(audio_data: Dict[str, Any]) -> List[Dict[str, Any]]:
     """
     Performs speaker diarization on provided audio data and returns segments.
@@ -90,30 +100,19 @@ def run_speaker_diarization(audio_data: Dict[str, Any]) -> List[Dict[str, Any]]:
         raise
 
     segments: List[Dict[str, Any]] = []
-    # Keep a numpy copy for efficient slicing
-    samples_np = waveform.squeeze(0).detach().cpu().numpy()
-
     for turn, _, speaker_label in diarization_result.itertracks(yield_label=True):
         start = float(turn.start)
         end = float(turn.end)
-        
+
         if end <= start:
             continue
-            
-        start_idx = int(start * sr)
-        end_idx = int(end * sr)
-        
-        # Slice the numpy array to get the audio for this segment
-        segment_audio_np = samples_np[start_idx:end_idx]
 
+        # Only the boundaries are returned; downstream modules slice the
+        # audio themselves, so copying per-segment samples here is wasted work.
         segments.append({
             "speaker": speaker_label,
             "start": start,
             "end": end,
-            # The ASR module expects a numpy array, so we pass that directly.
-            # No need to include the audio in the return dictionary if asr.py re-loads it,
-            # but it can be useful for other potential modules.
-            # "audio": segment_audio_np
         })
-        
+
     return segments
\ No newline at end of file
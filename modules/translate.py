@@ -1,9 +1,13 @@
 # Helsinki-NLP Translation Implementation (Optimized for Batching)
+import gc
 import logging
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, List, Dict
 import torch
 from transformers import MarianMTModel, MarianTokenizer
-import re
 
 logger = logging.getLogger("VoxiAPI")
 
@@ -20,8 +24,38 @@ HELSINKI_MODELS = {
     "mul_en": "Helsinki-NLP/opus-mt-mul-en",
 }
 
-# Cache for loaded models and tokenizers
-_translation_cache = {}
+# LRU cache for loaded models and tokenizers; bounded so a long-running
+# server with many source languages cannot accumulate checkpoints until
+# it runs out of GPU or host memory. The cache is mutated from several
+# threads (translation overlap on the shared pool, parallel warm-up,
+# gthread request concurrency), so every lookup/insert/evict holds the
+# lock.
+_translation_cache: "OrderedDict[str, tuple]" = OrderedDict()
+_cache_lock = threading.Lock()
+_MAX_TRANSLATION_MODELS = int(os.environ.get("VOXI_MAX_TRANSLATION_MODELS", "4"))
+
+def _evict_lru_models() -> None:
+    """
+    Drops least-recently-used translation models while the cache is full.
+    The caller must hold _cache_lock.
+    """
+    while len(_translation_cache) >= _MAX_TRANSLATION_MODELS:
+        evicted_key, (model, _) = _translation_cache.popitem(last=False)
+        logger.info(f"Evicting translation model '{evicted_key}' from cache.")
+        del model
+        gc.collect()
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+
+def clear_model_cache() -> None:
+    """Releases every cached translation model and its GPU memory."""
+    with _cache_lock:
+        while _translation_cache:
+            evicted_key, (model, _) = _translation_cache.popitem(last=False)
+            del model
+    gc.collect()
+    if torch.cuda.is_available():
+        torch.cuda.empty_cache()
 
 def _get_model_for_language_pair(source_lang: str, target_lang: str = "en"):
     """
@@ -29,9 +63,18 @@ def _get_model_for_language_pair(source_lang: str, target_lang: str = "en"):
     Falls back to a multilingual model if a specific one isn't found.
     """
     model_key = f"{source_lang}_{target_lang}"
-    
-    if model_key in _translation_cache:
-        return _translation_cache[model_key]
+    # VOXI_TRANSLATE_MULTI=1 serves every source language with the single
+    # many-to-English model: one resident set of weights instead of one
+    # ~300 MB checkpoint per language, trading some quality against the
+    # dedicated pairs. opus-mt-mul-en needs no target-language token since
+    # English is its only target.
+    if target_lang == "en" and os.environ.get("VOXI_TRANSLATE_MULTI", "0") == "1":
+        model_key = "mul_en"
+
+    with _cache_lock:
+        if model_key in _translation_cache:
+            _translation_cache.move_to_end(model_key)
+            return _translation_cache[model_key]
 
     # Find the appropriate model name, with a fallback to multilingual
     model_name = HELSINKI_MODELS.get(model_key, HELSINKI_MODELS["mul_en"])
@@ -39,23 +82,68 @@ def _get_model_for_language_pair(source_lang: str, target_lang: str = "en"):
         logger.warning(f"No specific model for {model_key}, falling back to {model_name}.")
 
     try:
+        # The load itself runs outside the lock so concurrent warm-ups of
+        # different languages still overlap their checkpoint I/O.
         logger.info(f"Loading Helsinki-NLP model: {model_name}")
         device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
         
         tokenizer = MarianTokenizer.from_pretrained(model_name)
-        model = MarianMTModel.from_pretrained(model_name).to(device)
-        
-        _translation_cache[model_key] = (model, tokenizer)
-        return model, tokenizer
-        
+        # low_cpu_mem_usage loads weights straight into their final storage
+        # instead of materializing a second fp32 copy during init, halving
+        # peak host RAM per checkpoint. VOXI_TRANSLATE_DTYPE can force a
+        # load dtype (e.g. float16/bfloat16) for memory-tight hosts.
+        load_kwargs = {"low_cpu_mem_usage": True}
+        dtype_name = os.environ.get("VOXI_TRANSLATE_DTYPE")
+        if dtype_name:
+            load_kwargs["torch_dtype"] = getattr(torch, dtype_name)
+        model = MarianMTModel.from_pretrained(model_name, **load_kwargs).to(device)
+        model.eval()
+        if device.type == "cuda":
+            # fp16 weights halve the decoder's memory traffic and use the
+            # tensor cores; MarianMT is robust to half precision at inference.
+            model = model.half()
+        elif os.environ.get("VOXI_TRANSLATE_INT8", "0") == "1":
+            # Opt-in dynamic int8 quantization of the linear layers for
+            # CPU-only hosts, mirroring the VOXI_WHISPER_INT8 flag in asr.py.
+            try:
+                model = torch.quantization.quantize_dynamic(
+                    model, {torch.nn.Linear}, dtype=torch.qint8)
+                logger.info(f"Applied dynamic int8 quantization to {model_name}.")
+            except Exception as e:
+                logger.warning(f"Dynamic int8 quantization failed, keeping fp32: {e}")
+
+        with _cache_lock:
+            if model_key in _translation_cache:
+                # Another thread raced us to the same pair; keep its entry
+                # (it may already be warm) and release our duplicate weights.
+                _translation_cache.move_to_end(model_key)
+                cached = _translation_cache[model_key]
+                del model
+            else:
+                _evict_lru_models()
+                _translation_cache[model_key] = (model, tokenizer)
+                return model, tokenizer
+        gc.collect()
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+        return cached
+
     except Exception as e:
         logger.error(f"Failed to load translation model {model_name}: {e}")
-        _translation_cache[model_key] = (None, None) # Cache failure to avoid retrying
+        with _cache_lock:
+            _translation_cache[model_key] = (None, None) # Cache failure to avoid retrying
         return None, None
 
+# Segments per model.generate call; keeps padding waste and peak memory down.
+_TRANSLATE_BATCH_SIZE = int(os.environ.get("VOXI_TRANSLATE_BATCH_SIZE", "16"))
+
 def _translate_batch(texts: List[str], source_lang: str, target_lang: str = "en") -> List[str]:
     """
     Translates a list of texts from a single source language to a target language.
+
+    Texts are sorted by tokenized length and translated in micro-batches so
+    each batch pads only to its own longest member instead of the global
+    maximum; results are written back in the original order.
     """
     model, tokenizer = _get_model_for_language_pair(source_lang, target_lang)
     if not model or not tokenizer:
@@ -64,14 +152,62 @@ def _translate_batch(texts: List[str], source_lang: str, target_lang: str = "en"
 
     try:
         device = model.device
-        batch = tokenizer(texts, return_tensors="pt", padding=True, truncation=True, max_length=512).to(device)
-        translated_ids = model.generate(**batch)
-        translated_texts = tokenizer.batch_decode(translated_ids, skip_special_tokens=True)
+        order = list(range(len(texts)))
+        if len(texts) > _TRANSLATE_BATCH_SIZE:
+            # Length sorting only pays off once there is more than one batch.
+            lengths = [len(ids) for ids in tokenizer(texts, truncation=True,
+                                                     max_length=512)["input_ids"]]
+            order.sort(key=lengths.__getitem__)
+
+        translated_texts: List[str] = [""] * len(texts)
+        for start in range(0, len(texts), _TRANSLATE_BATCH_SIZE):
+            chunk = order[start:start + _TRANSLATE_BATCH_SIZE]
+            batch = tokenizer([texts[i] for i in chunk], return_tensors="pt",
+                              padding=True, truncation=True, max_length=512).to(device)
+            # Translations rarely exceed ~1.5x the source length, so cap the
+            # decode loop relative to this batch's input instead of letting
+            # greedy decoding run to the model maximum.
+            max_new = min(512, int(1.5 * batch["input_ids"].shape[1]) + 8)
+            # Greedy decoding: Marian's default 4-beam search costs ~4x the
+            # decoder bandwidth for marginal gains on short ASR segments.
+            with torch.inference_mode():
+                translated_ids = model.generate(**batch, num_beams=1, do_sample=False,
+                                                max_new_tokens=max_new)
+            decoded = tokenizer.batch_decode(translated_ids, skip_special_tokens=True)
+            for i, text in zip(chunk, decoded):
+                translated_texts[i] = text
         return translated_texts
     except Exception as e:
         logger.error(f"Error during batch translation from {source_lang}: {e}")
         return texts # Return original texts on error
 
+def _warm_one(lang: str) -> None:
+    """Loads one language's model and runs a one-word generate through it."""
+    try:
+        _translate_batch(["hello"], lang)
+        logger.info(f"Translation model for '{lang}' warmed up.")
+    except Exception as e:
+        logger.warning(f"Translation warm-up failed for '{lang}': {e}")
+
+def warm_up() -> None:
+    """
+    Preloads translation models for the configured source languages and runs
+    one tiny generate per model, so checkpoint loading and first-call kernel
+    selection happen at startup instead of on the first request.
+    VOXI_PRELOAD_LANGS is a comma-separated list (default "hi"); set it
+    empty to skip translation preloading.
+    """
+    langs = [l.strip() for l in os.environ.get("VOXI_PRELOAD_LANGS", "hi").split(",")
+             if l.strip() and l.strip() != "en"]
+    if len(langs) <= 1:
+        for lang in langs:
+            _warm_one(lang)
+        return
+    # Checkpoint loading is dominated by hub/disk I/O, so several languages
+    # overlap well in threads.
+    with ThreadPoolExecutor(max_workers=len(langs)) as pool:
+        list(pool.map(_warm_one, langs))
+
 def translate_segments_to_english(segments: List[Dict]) -> None:
     """
     Translates a list of transcribed segments in-place.
@@ -103,7 +239,12 @@ def translate_to_english(text: str, source_lang: Optional[str]) -> str:
     """
     Translates a single block of text to English. Used for the full transcript.
     """
-    if not text or not source_lang or source_lang == "en" or source_lang == "unknown":
+    if not text or not text.strip() or not source_lang or source_lang in ("en", "unknown"):
+        return text
+
+    # Purely numeric/punctuation output has nothing to translate; skip the
+    # model forward entirely.
+    if not any(c.isalpha() for c in text):
         return text
 
     # The _translate_batch function expects a list
@@ -1,6 +1,7 @@
 # Test script for ASR and Translation
 import os
 import sys
+import threading
 import time
 import argparse
 import logging
@@ -79,13 +80,20 @@ def main():
         logger.error(f"Audio file not found: {args.audio}")
         return 1
     
+    # Warm the translation models in the background while ASR runs, so the
+    # translation stage starts decoding immediately instead of paying its
+    # checkpoint load after ASR finishes.
+    warmup_thread = threading.Thread(target=translate.warm_up, daemon=True)
+    warmup_thread.start()
+
     # Test ASR
     logger.info("=== Testing ASR ===")
     asr_result = test_asr(args.audio, args.language)
-    
+
     # Test Translation
     if asr_result and asr_result.get('text'):
         logger.info("\n=== Testing Translation ===")
+        warmup_thread.join()
         detected_lang = asr_result.get('language')
         translation_result = test_translation(asr_result.get('text'), detected_lang)
     